@@ -0,0 +1,356 @@
+"""
+国际象棋AI引擎（供chessz3.py使用）
+不依赖pygame，根节点并行搜索的子进程只需导入本模块
+"""
+
+import chess
+import chess.polyglot
+import os
+import math
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# 棋子基础价值，直接以piece_type（PAWN=1 ... KING=6）为下标
+PIECE_VALUES = (0, 100, 320, 330, 500, 900, 20000)
+
+# 位置价值表（示例：兵的中间位置加分），按白方视角自第8横排写起
+PAWN_TABLE = (
+    0,  0,  0,  0,  0,  0,  0,  0,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    10, 10, 20, 30, 30, 20, 10, 10,
+    5,  5, 10, 25, 25, 10,  5,  5,
+    0,  0,  0, 20, 20,  0,  0,  0,
+    5, -5,-10,  0,  0,-10, -5,  5,
+    5, 10, 10,-20,-20, 10, 10,  5,
+    0,  0,  0,  0,  0,  0,  0,  0
+)
+# 预先翻转好的双方位置表，直接以square（a1=0）索引
+PAWN_PST_W = tuple(PAWN_TABLE[sq ^ 56] for sq in range(64))
+PAWN_PST_B = tuple(PAWN_TABLE[sq] for sq in range(64))
+# 已带上颜色符号的位置表，以color（BLACK=0, WHITE=1）索引，评估时无需再乘符号
+PAWN_PST_SIGNED = (tuple(-v for v in PAWN_PST_B), PAWN_PST_W)
+
+# 中心格d4/d5/e4/e5
+CENTER_MASK = chess.BB_CENTER
+
+def _square_value(color, piece_type, square):
+    """单个棋子在某格上对评估值的贡献（白方为正）"""
+    value = PIECE_VALUES[piece_type]
+    if piece_type == chess.PAWN:
+        value += PAWN_PST_W[square] if color else PAWN_PST_B[square]
+    if chess.BB_SQUARES[square] & CENTER_MASK:
+        value += 50
+    return value if color else -value
+
+# 增量评估用：SQUARE_VALUES[color][piece_type][square]，piece_type为0的一行不使用
+SQUARE_VALUES = tuple(
+    tuple(tuple(_square_value(color, piece_type, sq) if piece_type else 0 for sq in range(64))
+          for piece_type in range(7))
+    for color in (chess.BLACK, chess.WHITE)
+)
+
+# 将杀分值，减去距根节点的步数以优先选择更快的将杀
+MATE_SCORE = 1000000
+# 绝对值超过该界限的分值视为将杀分值
+MATE_BOUND = MATE_SCORE - 1000
+
+# 置换表条目类型：精确值 / 下界 / 上界
+TT_EXACT = 0
+TT_LOWER = 1
+TT_UPPER = 2
+
+class ChessAIEngine:
+    def __init__(self, depth=3, tt_size=200000, workers=None):
+        self.depth = depth  # 搜索深度
+        # 置换表：zobrist哈希 -> (depth, flag, value, best_move)，超出容量时按LRU淘汰
+        self.tt = OrderedDict()
+        self.tt_size = tt_size
+        # 增量评估栈：栈顶为当前局面的评估值，随push_eval/pop_eval同步更新
+        self._eval_stack = []
+        # 根节点并行搜索的进程数，为1时只用单进程；进程池在首次使用时创建
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+
+    def shutdown(self):
+        """关闭根节点并行搜索用的进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def tt_probe(self, key, ply=0):
+        """查询置换表，命中时把条目移到末尾（最近使用）
+        表中的将杀分值以该节点自身为起点计步，取出时换算回距根节点的步数"""
+        entry = self.tt.get(key)
+        if entry is not None:
+            self.tt.move_to_end(key)
+            depth, flag, value, best_move = entry
+            if value > MATE_BOUND:
+                entry = (depth, flag, value - ply, best_move)
+            elif value < -MATE_BOUND:
+                entry = (depth, flag, value + ply, best_move)
+        return entry
+
+    def tt_store(self, key, depth, flag, value, best_move, ply=0):
+        """写入置换表，将杀分值先换算为从当前节点起计的步数，
+        同一局面在别的深度被查到时仍能得到正确的将杀距离"""
+        if value > MATE_BOUND:
+            value += ply
+        elif value < -MATE_BOUND:
+            value -= ply
+        self.tt[key] = (depth, flag, value, best_move)
+        self.tt.move_to_end(key)
+        if len(self.tt) > self.tt_size:
+            self.tt.popitem(last=False)
+
+    def castling_bonus(self, board):
+        """王的安全：保留易位权加分"""
+        bonus = 0
+        if board.has_kingside_castling_rights(chess.WHITE):
+            bonus += 30
+        if board.has_queenside_castling_rights(chess.WHITE):
+            bonus += 30
+        # 黑方同理...
+        return bonus
+
+    def push_eval(self, board, move):
+        """走棋并增量更新评估值，只计算走法涉及的几个格子"""
+        us = board.turn
+        ours, theirs = SQUARE_VALUES[us], SQUARE_VALUES[not us]
+        piece_type = board.piece_type_at(move.from_square)
+        delta = ours[move.promotion or piece_type][move.to_square] - ours[piece_type][move.from_square]
+
+        if piece_type == chess.KING and board.is_castling(move):
+            # 易位时车也随之移动
+            if board.is_kingside_castling(move):
+                rook_from, rook_to = move.to_square + 1, move.to_square - 1
+            else:
+                rook_from, rook_to = move.to_square - 2, move.to_square + 1
+            delta += ours[chess.ROOK][rook_to] - ours[chess.ROOK][rook_from]
+        elif board.is_en_passant(move):
+            delta -= theirs[chess.PAWN][move.to_square - 8 if us else move.to_square + 8]
+        else:
+            captured = board.piece_type_at(move.to_square)
+            if captured:
+                delta -= theirs[captured][move.to_square]
+
+        delta -= self.castling_bonus(board)
+        board.push(move)
+        delta += self.castling_bonus(board)
+        # 栈中保存的是走棋方视角的评估值，走棋后换边需取反
+        if not us:
+            delta = -delta
+        self._eval_stack.append(-(self._eval_stack[-1] + delta))
+
+    def pop_eval(self, board):
+        """撤销走棋并恢复评估值"""
+        board.pop()
+        self._eval_stack.pop()
+
+    def mvv_lva_key(self, board):
+        """吃子走法的排序键：被吃子价值 - 攻击子价值"""
+        piece_type_at = board.piece_type_at
+
+        def mvv_lva(move):
+            victim = piece_type_at(move.to_square) or chess.PAWN  # 吃过路兵时目标格为空
+            return PIECE_VALUES[victim] - PIECE_VALUES[piece_type_at(move.from_square)]
+        return mvv_lva
+
+    def order_moves(self, board, tt_move=None):
+        """走法排序：置换表最佳走法优先，其次按MVV-LVA排列吃子"""
+        # 每个节点只生成一次合法走法，同时分出吃子和非吃子走法
+        is_capture = board.is_capture
+        captures, quiets = [], []
+        for move in board.legal_moves:
+            (captures if is_capture(move) else quiets).append(move)
+
+        captures.sort(key=self.mvv_lva_key(board), reverse=True)
+        moves = captures + quiets
+        if tt_move is not None and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        return moves
+
+    def get_best_move(self, board, stop_event=None):
+        """获取最佳走棋（迭代加深，上一轮的最佳走法优先搜索）
+        stop_event被设置后放弃当前这一轮，返回上一轮完整搜索的结果"""
+        key = chess.polyglot.zobrist_hash(board)
+        entry = self.tt_probe(key)
+        moves = self.order_moves(board, entry[3] if entry else None)
+        pv_move = None
+        self._eval_stack = [self.evaluate(board)]
+
+        for d in range(1, self.depth+1):
+            if pv_move is not None:
+                moves = [pv_move] + [m for m in moves if m != pv_move]
+            best_move = None
+            best_value = -math.inf
+
+            # 最后一轮在根节点并行搜索（前面几轮很浅，进程间通信开销反而更大）
+            if d == self.depth and d > 1 and self.workers > 1 and len(moves) > 1:
+                best_move = self._search_root_parallel(board, moves, d)
+                moves = []
+
+            for move in moves:
+                if stop_event is not None and stop_event.is_set() and pv_move is not None:
+                    return pv_move
+                self.push_eval(board, move)
+                # 以当前最佳值作为alpha，后续走法可更早剪枝
+                value = -self.minimax(board, d-1, -math.inf, -best_value)
+                self.pop_eval(board)
+
+                if value > best_value:
+                    best_value = value
+                    best_move = move
+
+            pv_move = best_move
+
+        return pv_move
+
+    def _search_root_parallel(self, board, moves, depth):
+        """根节点分裂：先串行搜索第一个走法得到alpha，其余走法分发到多个进程并行搜索"""
+        first = moves[0]
+        self.push_eval(board, first)
+        best_value = -self.minimax(board, depth-1, -math.inf, math.inf)
+        self.pop_eval(board)
+        best_move = first
+
+        if self._executor is None:
+            # 显式使用spawn：搜索在AI线程中发起，fork一个带显示连接的多线程进程并不安全，也使各平台行为一致
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        fen = board.fen()
+        futures = [(move, self._executor.submit(_search_child, fen, move.uci(), depth-1, best_value))
+                   for move in moves[1:]]
+        # 按原有走法顺序比较，分数相同时保留排序靠前的走法
+        for move, future in futures:
+            value = future.result()
+            if value > best_value:
+                best_value = value
+                best_move = move
+        return best_move
+
+    def minimax(self, board, depth, alpha, beta):
+        """NegaMax算法配合Alpha-Beta剪枝和置换表（返回值以当前走棋方为视角）"""
+        # 不调用is_game_over()：它会额外生成一遍合法走法，终局改由下面的走法列表判断
+        if depth == 0:
+            if board.is_insufficient_material():
+                return 0
+            # 到达叶子节点后继续搜索吃子，避免水平线效应
+            return self.quiesce(board, alpha, beta)
+
+        # 查询置换表
+        ply = len(self._eval_stack) - 1
+        key = chess.polyglot.zobrist_hash(board)
+        entry = self.tt_probe(key, ply)
+        if entry and entry[0] >= depth:
+            _, flag, value, _ = entry
+            if flag == TT_EXACT:
+                return value
+            elif flag == TT_LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if beta <= alpha:
+                return value
+        alpha_orig, beta_orig = alpha, beta
+        best_move = None
+        # 复用上面已查到的置换表条目，不再重复查询
+        ordered_moves = self.order_moves(board, entry[3] if entry else None)
+        if not ordered_moves:
+            # 无子可走：被将军为将杀，否则为逼和
+            return -MATE_SCORE + ply if board.is_check() else 0
+
+        # 循环内频繁调用的方法先绑定为局部变量，减少属性查找
+        push, pop, search = self.push_eval, self.pop_eval, self.minimax
+        child_depth = depth - 1
+
+        best_val = -math.inf
+        for move in ordered_moves:
+            push(board, move)
+            eval = -search(board, child_depth, -beta, -alpha)
+            pop(board)
+            if eval > best_val:
+                best_val = eval
+                best_move = move
+            if eval >= beta:  # fail-soft beta剪枝
+                break
+            if eval > alpha:
+                alpha = eval
+
+        # 写入置换表
+        if best_val <= alpha_orig:
+            flag = TT_UPPER
+        elif best_val >= beta_orig:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        self.tt_store(key, depth, flag, best_val, best_move, ply)
+        return best_val
+
+    def quiesce(self, board, alpha, beta):
+        """静态搜索：只延伸吃子走法，直到局面平静"""
+        stand_pat = self._eval_stack[-1]
+        # 不吃子即可剪枝时无需生成吃子走法
+        if stand_pat >= beta:
+            return stand_pat
+        captures = sorted(board.generate_legal_captures(), key=self.mvv_lva_key(board), reverse=True)
+
+        best = stand_pat
+        alpha = max(alpha, stand_pat)
+        for move in captures:
+            self.push_eval(board, move)
+            value = -self.quiesce(board, -beta, -alpha)
+            self.pop_eval(board)
+            if value >= beta:
+                return value
+            if value > best:
+                best = value
+                alpha = max(alpha, value)
+        return best
+
+    def evaluate(self, board):
+        score = 0
+        # 循环内用到的函数先绑定为局部变量
+        popcount, lsb, pieces_mask = chess.popcount, chess.lsb, board.pieces_mask
+        white, black = chess.WHITE, chess.BLACK
+        
+        # 棋子价值：按位棋盘统计各类棋子数量
+        for piece_type in chess.PIECE_TYPES:
+            score += PIECE_VALUES[piece_type] * (popcount(pieces_mask(piece_type, white))
+                              - popcount(pieces_mask(piece_type, black)))
+
+        # 位置调整：按颜色选好位置表后遍历兵的位棋盘
+        for color in chess.COLORS:
+            pst = PAWN_PST_SIGNED[color]
+            bb = pieces_mask(chess.PAWN, color)
+            while bb:
+                score += pst[lsb(bb)]
+                bb &= bb - 1  # 清除最低位
+        
+        # 局面特征评估（示例：）
+        # 1. 中心控制（d4/d5/e4/e5格子是否有棋子），Python 3.10+上chess.popcount即int.bit_count
+        occupied_co = board.occupied_co
+        score += 50 * (popcount(occupied_co[white] & CENTER_MASK)
+                       - popcount(occupied_co[black] & CENTER_MASK))
+        
+        # 2. 王的安全（根据王前兵是否完整）
+        score += self.castling_bonus(board)
+        
+        # 转换为当前走棋方视角
+        return score if board.turn == chess.WHITE else -score
+
+
+# 并行搜索子进程中的引擎，保留各自的置换表供后续任务复用
+_worker_engine = None
+
+def _search_child(fen, uci, depth, alpha):
+    """子进程入口：走一步后搜索，返回根节点视角的分值"""
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = ChessAIEngine(workers=1)
+    engine = _worker_engine
+    board = chess.Board(fen)
+    engine._eval_stack = [engine.evaluate(board)]
+    engine.push_eval(board, chess.Move.from_uci(uci))
+    return -engine.minimax(board, depth, -math.inf, -alpha)
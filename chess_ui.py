@@ -0,0 +1,307 @@
+"""
+国际象棋人机对战界面（chessz1.py / chessz3.py 共用）
+"""
+
+import functools
+import queue
+import threading
+import pygame
+import chess
+
+# 棋盘参数
+SQUARE_SIZE = 68
+BOARD_SIZE = SQUARE_SIZE * 8
+
+# AI搜索完成时由后台线程投递的事件
+AI_MOVE_EVENT = pygame.USEREVENT
+
+
+@functools.lru_cache(maxsize=None)
+def load_images_cached():
+    """加载棋子图片，只解码一次（需在pygame.display.set_mode之后调用）"""
+    images = {}
+    pieces = ["pawn", "night", "bishop", "rook", "queen", "king"]
+    colors = ["w", "b"]
+    
+    for color in colors:
+        for piece in pieces:
+            key = f"{color}{piece[0].upper()}"
+            # 加载后立即转换为显示格式，避免每次blit时逐像素转换
+            try:
+                img = pygame.image.load(f"img/{color}{piece[0].upper()}.png").convert_alpha()
+            except:
+                img = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE)).convert()
+                img.fill((255, 0, 255))  # 错误时显示粉色方块
+            images[key] = pygame.transform.scale(img, (SQUARE_SIZE, SQUARE_SIZE))
+    return images
+
+
+class ChessGameBase:
+    """人机对战界面，子类实现get_ai_move提供AI走法"""
+
+    def __init__(self, ai_color=chess.BLACK):
+        # 初始化棋盘
+        self.board = chess.Board()
+        self.ai_color = ai_color
+        self.selected_square = None
+        self.human_color = not ai_color
+        self.game_over = False
+        # 需要重绘的格子；_full_redraw为True时整盘重绘
+        self._dirty_squares = set()
+        self._full_redraw = True
+        # AI在后台线程搜索，结果通过队列交回主线程
+        self._ai_thread = None
+        self._ai_result_q = queue.Queue()
+        self._ai_stop = threading.Event()
+        self._ai_error = None
+        
+        # 初始化Pygame
+        pygame.init()
+        # 只让SDL把用到的事件放进队列（MOUSEMOTION等无需处理的事件直接丢弃）
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.VIDEOEXPOSE, AI_MOVE_EVENT])
+        self.screen = pygame.display.set_mode((BOARD_SIZE, BOARD_SIZE))
+        pygame.display.set_caption("Chess AI")
+        self.load_images()
+        self._build_background()
+        
+        # 自动开始游戏
+        if self.human_color != chess.WHITE:
+            self.make_ai_move()
+
+    def load_images(self):
+        """加载棋子图片（多个实例共享同一组Surface）"""
+        self.pieces = load_images_cached()
+
+    def _build_background(self):
+        """预先把不变的棋盘格绘制到一张Surface上，绘制时只需blit"""
+        colors = [(238, 238, 210), (118, 150, 86)]
+        self._board_bg = pygame.Surface((BOARD_SIZE, BOARD_SIZE)).convert()
+        for row in range(8):
+            for col in range(8):
+                color = colors[(row + col) % 2]
+                rect = (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+                pygame.draw.rect(self._board_bg, color, rect)
+
+    def square_rect(self, square):
+        """格子在屏幕上的矩形区域"""
+        col = square & 7  # 等价于chess.square_file
+        row = 7 - (square >> 3)  # 等价于7 - chess.square_rank
+        return pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+
+    def mark_dirty(self, *squares):
+        """标记需要重绘的格子"""
+        self._dirty_squares.update(sq for sq in squares if sq is not None)
+
+    def push_move(self, move):
+        """走棋，并把棋子有变化的格子（含易位的车、吃过路兵）标记为需重绘"""
+        before = self.board.piece_map()
+        self.board.push(move)
+        after = self.board.piece_map()
+        self.mark_dirty(*(sq for sq in before.keys() | after.keys() if before.get(sq) != after.get(sq)))
+
+    def draw_board(self):
+        """绘制棋盘和棋子（只重绘有变化的格子）"""
+        if self._full_redraw:
+            squares = chess.SQUARES
+        elif self._dirty_squares:
+            squares = list(self._dirty_squares)
+        else:
+            return
+
+        rects = []
+        # 循环内用到的方法先绑定为局部变量
+        screen, pieces, selected, board_bg = self.screen, self.pieces, self.selected_square, self._board_bg
+        piece_at, blit, square_rect = self.board.piece_at, screen.blit, self.square_rect
+        if self._full_redraw:
+            # 绘制棋盘背景：整盘重绘时一次blit即可
+            blit(board_bg, (0, 0))
+        for square in squares:
+            rect = square_rect(square)
+            rects.append(rect)
+            # 局部重绘时从背景Surface上复制该格
+            if not self._full_redraw:
+                blit(board_bg, rect, rect)
+
+            # 绘制棋子
+            piece = piece_at(square)
+            if piece:
+                color = "w" if piece.color else "b"
+                piece_type = piece.symbol().upper()
+                blit(pieces[f"{color}{piece_type}"], rect)
+
+            # 绘制选中高亮
+            if square == selected:
+                surface = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE))
+                surface.set_alpha(100)
+                surface.fill((255, 255, 0))
+                blit(surface, rect)
+
+        if self._full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+        self._full_redraw = False
+        self._dirty_squares.clear()
+
+    def get_ai_move(self, board):
+        """返回AI选择的走法，由子类实现（在后台线程中调用，board为副本）"""
+        raise NotImplementedError
+
+    def close(self):
+        """退出前停止搜索并等待AI线程结束，子类重写时需先调用父类方法再释放AI资源"""
+        self._ai_stop.set()
+        if self._ai_thread is not None:
+            self._ai_thread.join(timeout=2)
+
+    @property
+    def ai_thinking(self):
+        """AI是否正在搜索"""
+        return self._ai_thread is not None and self._ai_thread.is_alive()
+
+    def make_ai_move(self):
+        """AI走棋：在后台线程中搜索，避免界面卡住"""
+        if not self.game_over and self.board.turn == self.ai_color and not self.ai_thinking:
+            self._ai_thread = threading.Thread(target=self._ai_worker, args=(self.board.copy(),), daemon=True)
+            self._ai_thread.start()
+
+    def _ai_worker(self, board):
+        """后台线程：搜索完成后把走法放入队列，并投递事件唤醒主循环；出错时放入None"""
+        best_move = None
+        try:
+            best_move = self.get_ai_move(board)
+        except Exception as e:
+            self._ai_error = e
+        finally:
+            self._ai_result_q.put(best_move)
+            # 已在退出时pygame可能已关闭，不能再投递事件
+            if not self._ai_stop.is_set():
+                pygame.event.post(pygame.event.Event(AI_MOVE_EVENT))
+
+    def poll_ai_move(self):
+        """主线程收到AI_MOVE_EVENT后调用：取出AI的走法并落子"""
+        try:
+            best_move = self._ai_result_q.get_nowait()
+        except queue.Empty:
+            return
+        if best_move is None:
+            # AI搜索失败（如引擎崩溃），结束对局而不是让玩家无法继续操作
+            print(f"AI error: {self._ai_error!r}, game over!")
+            self.game_over = True
+            return
+        self.push_move(best_move)
+        self.check_game_over()
+
+    def handle_click(self, pos):
+        """处理玩家点击（包含升变逻辑）"""
+        if self.game_over or self.board.turn != self.human_color or self.ai_thinking:
+            return
+
+        col = pos[0] // SQUARE_SIZE
+        row = 7 - (pos[1] // SQUARE_SIZE)
+        square = chess.square(col, row)
+
+        # 选择棋子阶段
+        if self.selected_square==None :
+            piece = self.board.piece_at(square)
+            if piece and piece.color == self.human_color:
+                self.selected_square = square
+                self.mark_dirty(square)
+
+        # 移动棋子阶段
+        else:
+            from_piece = self.board.piece_at(self.selected_square)
+            move = chess.Move(self.selected_square, square)
+            
+            # 检测兵升变条件
+            if from_piece and from_piece.piece_type == chess.PAWN:
+                target_rank = chess.square_rank(square)
+                if (self.human_color == chess.WHITE and target_rank == 7) or \
+                (self.human_color == chess.BLACK and target_rank == 0):
+                    # 显示升变选择菜单
+                    move = self.handle_promotion(move)
+            
+            if move in self.board.legal_moves:
+                self.push_move(move)
+                self.check_game_over()
+                if not self.game_over:
+                    self.make_ai_move()
+            self.mark_dirty(self.selected_square)
+            self.selected_square = None
+
+    def handle_promotion(self, move):
+        """显示升变选择界面"""
+        # 创建选择菜单
+        promotion_pieces = [
+            (chess.QUEEN, "Q"),
+            (chess.ROOK, "R"),
+            (chess.BISHOP, "B"),
+            (chess.KNIGHT, "N")
+        ]
+        
+        # 在棋盘上方绘制选择框
+        menu_width = SQUARE_SIZE * 4
+        menu_height = SQUARE_SIZE
+        menu_x = (chess.square_file(move.to_square) * SQUARE_SIZE) - 1.5 * SQUARE_SIZE
+        menu_y = 50 if self.board.turn == chess.WHITE else BOARD_SIZE - 50 - menu_height
+        
+        # 绘制背景
+        menu_surface = pygame.Surface((menu_width, menu_height))
+        menu_surface.fill((200, 200, 200))
+        
+        # 绘制选项
+        for i, (piece_type, symbol) in enumerate(promotion_pieces):
+            rect = pygame.Rect(i*SQUARE_SIZE, 0, SQUARE_SIZE, SQUARE_SIZE)
+            pygame.draw.rect(menu_surface, (150, 150, 150), rect)
+            
+            # 显示棋子图标
+            color = "w" if self.board.turn == chess.WHITE else "b"
+            piece_key = f"{color}{symbol}"
+            menu_surface.blit(self.pieces[piece_key], (i*SQUARE_SIZE, 0))
+        
+        # 显示菜单并获取选择
+        self.screen.blit(menu_surface, (menu_x, menu_y))
+        pygame.display.flip()
+        
+        # 等待玩家选择（阻塞等待事件，不空转轮询）
+        while True:
+            event = pygame.event.wait()
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                x, y = event.pos
+                if menu_x <= x <= menu_x + menu_width and menu_y <= y <= menu_y + menu_height:
+                    index = int((x - menu_x) // SQUARE_SIZE) #式转换为整数
+                    self._full_redraw = True  # 菜单覆盖了棋盘，需整盘重绘
+                    return chess.Move(move.from_square, move.to_square, promotion=promotion_pieces[index][0])
+
+
+    def check_game_over(self):
+        """检查游戏结束状态"""
+        if self.board.is_checkmate():
+            winner = "Black" if self.board.turn else "White"
+            print(f"Checkmate! {winner} wins!")
+            self.game_over = True
+        elif self.board.is_stalemate():
+            print("Draw by stalemate!")
+            self.game_over = True
+        elif self.board.is_insufficient_material():
+            print("Draw by insufficient material!")
+            self.game_over = True
+
+    def run(self):
+        """主游戏循环：阻塞等待事件，只在状态变化时重绘，空闲时不占用CPU"""
+        self.draw_board()
+        while True:
+            event = pygame.event.wait()
+            if event.type == pygame.QUIT:
+                self.close()
+                pygame.quit()
+                return
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                self.handle_click(event.pos)
+            elif event.type == pygame.VIDEOEXPOSE:
+                self._full_redraw = True  # 窗口被遮挡后恢复
+            elif event.type == AI_MOVE_EVENT:
+                self.poll_ai_move()
+
+            # 没有需要重绘的格子时draw_board直接返回
+            self.draw_board()
@@ -0,0 +1,65 @@
+"""chess_engine的回归测试：增量评估（push_eval/pop_eval）必须与完整evaluate()一致
+
+运行：python -m pytest -q
+"""
+import random
+
+import chess
+
+from chess_engine import ChessAIEngine
+
+
+def check_push_pop(engine, board, moves):
+    """依次走棋并撤销，每一步都与完整评估比较"""
+    engine._eval_stack = [engine.evaluate(board)]
+    for move in moves:
+        engine.push_eval(board, move)
+        assert engine._eval_stack[-1] == engine.evaluate(board), (board.fen(), move.uci())
+    while len(engine._eval_stack) > 1:
+        engine.pop_eval(board)
+        assert engine._eval_stack[-1] == engine.evaluate(board), board.fen()
+
+
+def test_special_moves():
+    """易位（双方、两翼）、吃过路兵、升变（含吃子升变和低升变）"""
+    engine = ChessAIEngine(workers=1)
+    cases = [
+        ("r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K2R w KQkq - 0 1", ["e1g1", "e8c8"]),
+        ("r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K2R w KQkq - 0 1", ["e1c1", "e8g8"]),
+        ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", ["e5d6"]),
+        ("4k3/8/8/8/3Pp3/8/8/4K3 b - d3 0 1", ["e4d3"]),
+        ("1n6/P7/7k/8/8/8/7p/4K1N1 w - - 0 1", ["a7b8q", "h2g1n"]),
+        ("8/P7/7k/8/8/8/7p/4K3 w - - 0 1", ["a7a8r", "h2h1b"]),
+    ]
+    for fen, ucis in cases:
+        board = chess.Board(fen)
+        check_push_pop(engine, board, [chess.Move.from_uci(uci) for uci in ucis])
+        assert board.fen() == fen
+
+
+def test_random_playouts():
+    """随机对局，并确认其中确实出现了易位、吃过路兵和升变"""
+    engine = ChessAIEngine(workers=1)
+    rng = random.Random(0)
+    seen = {"castling": 0, "en_passant": 0, "promotion": 0}
+    for _ in range(200):
+        board = chess.Board()
+        moves = []
+        for _ in range(200):
+            legal = list(board.legal_moves)
+            if not legal:
+                break
+            move = rng.choice(legal)
+            seen["castling"] += board.is_castling(move)
+            seen["en_passant"] += board.is_en_passant(move)
+            seen["promotion"] += move.promotion is not None
+            moves.append(move)
+            board.push(move)
+        check_push_pop(engine, chess.Board(), moves)
+    assert all(seen.values()), seen
+
+
+if __name__ == "__main__":
+    test_special_moves()
+    test_random_playouts()
+    print("ok")